@@ -0,0 +1,228 @@
+# File Manager Vibe - pane hot path benchmark
+# Drives a real main window on the offscreen Qt platform against generated trees (one huge flat folder, a folder
+# of images, a deep chain of nested folders) and times navigation to first row, Images view fill, drop-to-copy
+# throughput and layout switching, plus peak RSS. Results can be written as JSON and compared with a baseline;
+# the exit status is 1 if any metric regressed by more than the tolerance.
+# Timings only compare on one machine with one set of sizes, so no baseline is checked in. Record one with --json
+# from the revision to compare against, then run the change with --baseline and the same --data and sizes:
+#
+#   git stash && python benchmarks/bench_panes.py --data /scratch/fmv-bench --json baseline.json && git stash pop
+#   python benchmarks/bench_panes.py --data /scratch/fmv-bench --baseline baseline.json
+#   python benchmarks/bench_panes.py --small-files 20000 --images 2000 --depth 64 --repeat 2   (quick run)
+import argparse
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from PyQt6.QtCore import QBuffer, QEventLoop, QIODevice, QMimeData, QSettings, QStandardPaths, QTimer, QUrl, PYQT_VERSION_STR, QT_VERSION_STR
+from PyQt6.QtGui import QColor, QImage, QLinearGradient, QPainter
+from PyQt6.QtWidgets import QApplication
+import FileMgr3
+from FileMgr3 import DirectoryCache, FileManagerVibeAgain, FileOperationQueue, PixmapStore
+
+try: import resource
+except ImportError: resource = None  # Windows: peak RSS is not reported
+
+def peak_rss_mb():
+    if resource is None: return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1048576 if sys.platform == "darwin" else peak / 1024  # bytes on macOS, KB elsewhere
+
+# --- Test data ---
+def sample_image(index):
+    image = QImage(256, 192, QImage.Format.Format_RGB32); painter = QPainter(image)
+    gradient = QLinearGradient(0, 0, 256, 192)
+    gradient.setColorAt(0, QColor.fromHsv(index * 37 % 360, 200, 230)); gradient.setColorAt(1, QColor.fromHsv(index * 91 % 360, 160, 90))
+    painter.fillRect(image.rect(), gradient); painter.end()
+    buffer = QBuffer(); buffer.open(QIODevice.OpenModeFlag.WriteOnly); image.save(buffer, "JPG", 85)
+    return bytes(buffer.data())
+
+def make_data(root, small_files, images, depth):
+    # Generating a million files takes a while, so a --data folder is reused as long as it was built with the same sizes.
+    params = {"small_files": small_files, "images": images, "depth": depth}; marker = os.path.join(root, "bench-data.json")
+    try:
+        with open(marker) as f:
+            if json.load(f) == params: return
+    except (OSError, ValueError): pass
+    for name in ("flat", "images", "deep", "empty"): shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+    print(f"Generating {small_files:,} small files, {images:,} images and {depth} nested folders in {root}")
+    for name in ("flat", "images", "empty"): os.makedirs(os.path.join(root, name))
+    payload = b"x" * 64
+    for i in range(small_files):
+        with open(os.path.join(root, "flat", f"file{i:07d}.txt"), "wb") as f: f.write(payload)
+    variants = [sample_image(i) for i in range(16)]
+    for i in range(images):
+        with open(os.path.join(root, "images", f"img{i:06d}.jpg"), "wb") as f: f.write(variants[i % len(variants)])
+    folder = os.path.join(root, "deep")
+    for level in range(depth):
+        folder = os.path.join(folder, f"d{level:03d}"); os.makedirs(folder)
+        for i in range(20):
+            with open(os.path.join(folder, f"f{i:02d}.txt"), "wb") as f: f.write(payload)
+    with open(marker, "w") as f: json.dump(params, f)
+
+def deep_levels(root, depth):
+    folder, levels = os.path.join(root, "deep"), []
+    for level in range(depth): folder = os.path.join(folder, f"d{level:03d}"); levels.append(folder)
+    return levels
+
+# --- Harness ---
+class Bench:
+    def __init__(self, app, window, timeout):
+        self.app = app; self.window = window; self.timeout = timeout; self.metrics = {}
+        self._tick = QTimer(); self._tick.start(5)  # wakes the event loop so conditions are re-checked while idle
+    def wait(self, condition, what):
+        deadline = time.perf_counter() + self.timeout
+        while not condition():
+            if time.perf_counter() > deadline: raise TimeoutError(f"timed out after {self.timeout} s waiting for {what}")
+            self.app.processEvents(QEventLoop.ProcessEventsFlag.WaitForMoreEvents)
+    def record(self, name, value, unit, better="lower"):
+        self.metrics[name] = {"value": value, "unit": unit, "better": better}
+        print(f"{name:40} {value:12.1f} {unit}" if value is not None else f"{name:40} {'n/a':>12}")
+    def forget(self, path):
+        # Drop a folder from the shared cache (including the warm LRU) so the next visit scans it cold.
+        cache = DirectoryCache.instance(); listing = cache.listing(path)
+        if listing is not None and listing.refcount == 0: cache._warm.pop(cache.key(path), None); cache._evict(listing)
+    def open(self, pane, path):
+        # Folders the cache doesn't hold are probed before the pane switches to them, so wait for it to get there.
+        pane.navigate_to(path); self.wait(lambda: pane.path == path and pane.listing.loaded, f"listing of {path}")
+    def navigate(self, pane, path):
+        # Returns seconds to first row, to the full listing and to the sorted view, probe included.
+        model = pane.model; first = []
+        def on_rows(*_):
+            if not first and pane.path == path and model.rowCount(): first.append(time.perf_counter())
+        model.rowsInserted.connect(on_rows); model.modelReset.connect(on_rows)
+        try:
+            started = time.perf_counter(); pane.navigate_to(path); on_rows()
+            self.wait(lambda: pane.path == path and pane.listing.loaded, f"listing of {path}"); loaded = time.perf_counter()
+            self.wait(lambda: model._order is not None or not len(pane.listing.entries), f"sorting {path}"); ordered = time.perf_counter()
+        finally: model.rowsInserted.disconnect(on_rows); model.modelReset.disconnect(on_rows)
+        return (first[0] if first else loaded) - started, loaded - started, ordered - started
+
+def bench_navigation(bench, pane, root, repeat, depth):
+    for name in ("flat", "images"):
+        path = os.path.join(root, name); runs = []
+        for _ in range(repeat):
+            bench.open(pane, os.path.join(root, "empty")); bench.forget(path); runs.append(bench.navigate(pane, path))
+        bench.record(f"navigate {name}: first row", min(run[0] for run in runs) * 1000, "ms")
+        bench.record(f"navigate {name}: full listing", min(run[1] for run in runs) * 1000, "ms")
+        bench.record(f"navigate {name}: sorted", min(run[2] for run in runs) * 1000, "ms")
+    levels = deep_levels(root, depth); times = []
+    for path in levels: bench.forget(path)
+    for path in levels: times.append(bench.navigate(pane, path)[1])
+    bench.record("navigate deep: per level (median)", statistics.median(times) * 1000, "ms")
+    bench.record("navigate deep: per level (max)", max(times) * 1000, "ms")
+
+def bench_images(bench, pane, root, images):
+    path = os.path.join(root, "images"); bench.open(pane, os.path.join(root, "empty")); bench.forget(path)
+    pane.apply_view_mode("images")
+    started = time.perf_counter(); pane.navigate_to(path)
+    bench.wait(lambda: pane.image_model.rowCount() >= images, "Images view rows"); filled = time.perf_counter() - started
+    bench.record("images view: fill rate", images / filled, "rows/s", better="higher")
+    # The first screen of tiles, decoded cold (the cache folder starts empty), then again from the thumbnail cache.
+    # A synchronous repaint requests exactly the tiles the view paints; the screen is done when none is outstanding.
+    model = pane.image_model; store = PixmapStore.instance()
+    for label in ("decoded", "from cache"):
+        budget = store.budget_bytes; store.set_budget(0); store.set_budget(budget)
+        started = time.perf_counter(); pane.image_view.viewport().repaint()
+        bench.wait(lambda: not model._requested, f"first screen of thumbnails ({label})")
+        bench.record(f"images view: first screen {label}", (time.perf_counter() - started) * 1000, "ms")
+    pane.apply_view_mode("detailed")
+
+def bench_copy(bench, pane, root, count):
+    flat = os.path.join(root, "flat"); names = sorted(os.listdir(flat))[:count]
+    target = os.path.join(root, "copy-target"); shutil.rmtree(target, ignore_errors=True); os.makedirs(target)
+    bench.open(pane, target)
+    mime_data = QMimeData(); mime_data.setUrls([QUrl.fromLocalFile(os.path.join(flat, name)) for name in names])
+    queue = FileOperationQueue.instance(); before = len(queue.jobs)
+    started = time.perf_counter(); pane._perform_file_operation(mime_data, "copy")
+    bench.wait(lambda: len(queue.jobs) > before and queue.jobs[-1].is_finished, "copy job"); elapsed = time.perf_counter() - started
+    job = queue.jobs[-1]
+    if job.errors: print(f"copy finished with {len(job.errors)} error(s), e.g. {job.errors[0]}")
+    bench.record("drop copy: files", job.done_files / elapsed, "files/s", better="higher")
+    bench.record("drop copy: bytes", job.done_bytes / 1048576 / elapsed, "MB/s", better="higher")
+    bench.open(pane, os.path.join(root, "empty")); shutil.rmtree(target, ignore_errors=True)
+
+def bench_layouts(bench, window, root, repeat):
+    window.set_layout(2, [os.path.join(root, "flat"), os.path.join(root, "images")])
+    bench.wait(lambda: all(pane.listing and pane.listing.loaded for pane in window.panes), "layout panes")
+    for layout_id in (41, 42, 3, 31, 32, 21, 1): window.set_layout(layout_id)  # fill the pool before timing
+    bench.wait(lambda: all(pane.listing and pane.listing.loaded for pane in window.pane_pool), "pooled panes")
+    cache = DirectoryCache.instance(); scans = cache.scans; times = []
+    for _ in range(repeat):
+        for layout_id in (2, 41, 1, 42, 3, 31, 21, 32):
+            # Wall time up to the first idle: the views' relayout after a re-parent counts too.
+            started = time.perf_counter(); window.set_layout(layout_id); bench.app.processEvents(); times.append(time.perf_counter() - started)
+    bench.record("layout switch (median)", statistics.median(times) * 1000, "ms")
+    bench.record("layout switch (max)", max(times) * 1000, "ms")
+    bench.record("layout switch: rescans", cache.scans - scans, "scans")
+
+def compare(results, baseline, tolerance):
+    if baseline.get("params") != results["params"]: print("Note: the baseline was run with different parameters", baseline.get("params"))
+    regressions = []
+    print(f"\n{'metric':40} {'baseline':>12} {'now':>12} {'change':>8}")
+    for name, metric in results["metrics"].items():
+        base = baseline.get("metrics", {}).get(name)
+        if not base or not base["value"] or metric["value"] is None: continue
+        change = (metric["value"] - base["value"]) / base["value"]
+        worse = change > tolerance if metric["better"] == "lower" else change < -tolerance
+        if worse: regressions.append(name)
+        print(f"{name:40} {base['value']:12.1f} {metric['value']:12.1f} {change:+8.0%}{'  REGRESSION' if worse else ''}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Pane hot path benchmark for File Manager Vibe")
+    parser.add_argument("--data", help="folder to build (and reuse) the test trees in; defaults to a temp dir removed afterwards")
+    parser.add_argument("--small-files", type=int, default=1000000)
+    parser.add_argument("--images", type=int, default=50000)
+    parser.add_argument("--depth", type=int, default=200)
+    parser.add_argument("--copy-files", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--timeout", type=float, default=600, help="seconds to wait for any one step")
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--baseline", help="compare with results written by an earlier --json run")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="allowed slowdown before a metric counts as a regression")
+    args = parser.parse_args()
+
+    scratch = tempfile.mkdtemp(prefix="fmv-bench-"); root = args.data or os.path.join(scratch, "data")
+    # Settings, thumbnails, indexes and hashes go to throwaway locations, so runs start cold and leave the user's alone.
+    QStandardPaths.setTestModeEnabled(True)
+    QSettings.setDefaultFormat(QSettings.Format.IniFormat); QSettings.setPath(QSettings.Format.IniFormat, QSettings.Scope.UserScope, scratch)
+    app = QApplication(sys.argv); app.setStyle("Fusion"); app.setStyleSheet(FileMgr3.DARK_STYLESHEET)  # styling is a real share of layout cost
+    try:
+        os.makedirs(root, exist_ok=True); make_data(root, args.small_files, args.images, args.depth)
+        shutil.rmtree(FileMgr3.app_cache_dir(), ignore_errors=True)
+        settings = QSettings(FileMgr3.APP_AUTHOR, FileMgr3.APP_NAMESHORT)
+        settings.setValue("layout_id", 1); settings.setValue("pane_paths", [os.path.join(root, "empty")]); settings.setValue("index_roots", [os.path.join(root, "empty")])
+        window = FileManagerVibeAgain(); window.resize(1400, 800); window.show()
+        # Neighbour prefetch would scan the other test trees in the background mid-measurement; time the panes alone.
+        DirectoryCache.instance().prefetch = lambda paths: None
+        bench = Bench(app, window, args.timeout)
+        bench.wait(lambda: window.started, "startup"); pane = window.panes[0]
+        rss = {}
+        bench_navigation(bench, pane, root, args.repeat, args.depth); rss["navigation"] = peak_rss_mb()
+        bench_images(bench, pane, root, args.images); rss["images"] = peak_rss_mb()
+        bench_copy(bench, pane, root, min(args.copy_files, args.small_files)); rss["copy"] = peak_rss_mb()
+        bench_layouts(bench, window, root, args.repeat); rss["layouts"] = peak_rss_mb()
+        for phase, value in rss.items(): bench.record(f"peak RSS after {phase}", value, "MB")
+        results = {"platform": sys.platform, "python": sys.version.split()[0], "qt": QT_VERSION_STR, "pyqt": PYQT_VERSION_STR,
+                   "params": {"small_files": args.small_files, "images": args.images, "depth": args.depth, "copy_files": args.copy_files},
+                   "metrics": bench.metrics}
+        if args.json:
+            with open(args.json, "w") as f: json.dump(results, f, indent=2)
+        regressions = []
+        if args.baseline:
+            with open(args.baseline) as f: regressions = compare(results, json.load(f), args.tolerance)
+            print(f"\n{len(regressions)} regression(s)" + (": " + ", ".join(regressions) if regressions else ""))
+        window.close()
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+    sys.exit(1 if regressions else 0)
+
+if __name__ == "__main__":
+    main()
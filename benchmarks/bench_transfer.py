@@ -0,0 +1,98 @@
+# File Manager Vibe - copy/move throughput benchmark
+# Compares every FastCopier strategy, and the FileJob engine as a whole, against plain shutil.copy
+# on one large file and on a tree of many small files. The forced-strategy rows run every file through that
+# strategy, small ones included; "engine (auto)" is what a real job does (one read/write per small file).
+#
+#   python benchmarks/bench_transfer.py --large-mb 2048 --small-files 20000 --json results.json
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from FileMgr3 import FastCopier, FileJob
+
+def make_large_file(path, size_mb):
+    block = os.urandom(1024 * 1024)
+    with open(path, "wb") as f:
+        for _ in range(size_mb): f.write(block)
+
+def make_small_tree(root, count, size, per_dir=200):
+    payload = os.urandom(size)
+    for i in range(count):
+        folder = os.path.join(root, f"dir{i // per_dir:05d}")
+        if i % per_dir == 0: os.makedirs(folder, exist_ok=True)
+        with open(os.path.join(folder, f"file{i:07d}.dat"), "wb") as f: f.write(payload)
+
+def tree_stats(root):
+    files = total = 0
+    for folder, _, names in os.walk(root):
+        for name in names: files += 1; total += os.path.getsize(os.path.join(folder, name))
+    return files, total
+
+def run_shutil(source, destination):
+    if os.path.isdir(source): shutil.copytree(source, destination, copy_function=shutil.copy)
+    else: shutil.copy(source, destination)
+
+def run_engine(strategy):
+    def run(source, destination):
+        os.makedirs(destination)
+        job = FileJob("copy", [source], destination)
+        if strategy: job.copier = FastCopier(strategy)
+        job.run()
+        if job.errors: raise OSError(f"{len(job.errors)} failed, first: {job.errors[0]}")
+    return run
+
+def measure(runner, source, scratch, repeat):
+    best = None
+    for attempt in range(repeat):
+        destination = os.path.join(scratch, f"out{attempt}")
+        start = time.perf_counter()
+        runner(source, destination)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+        shutil.rmtree(destination, ignore_errors=True)
+        if os.path.isfile(destination): os.remove(destination)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description="Copy/move throughput benchmark for File Manager Vibe")
+    parser.add_argument("--root", help="directory to build the test data in (defaults to a temp dir on the same disk as TMP)")
+    parser.add_argument("--large-mb", type=int, default=1024)
+    parser.add_argument("--small-files", type=int, default=10000)
+    parser.add_argument("--small-size", type=int, default=4096)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix="fmv-bench-", dir=args.root)
+    try:
+        large = os.path.join(root, "large.bin"); small = os.path.join(root, "small")
+        print(f"Generating {args.large_mb} MB file and {args.small_files} x {args.small_size} B files in {root}")
+        make_large_file(large, args.large_mb); make_small_tree(small, args.small_files, args.small_size)
+        runners = {"shutil.copy": run_shutil, "engine (auto)": run_engine(None)}
+        for strategy in FastCopier.STRATEGIES:
+            if FastCopier.is_available(strategy): runners[f"engine ({strategy})"] = run_engine(strategy)
+        results = []
+        for workload, source in (("large file", large), ("small files", small)):
+            files, total = tree_stats(source) if os.path.isdir(source) else (1, os.path.getsize(source))
+            for name, runner in runners.items():
+                scratch = os.path.join(root, "scratch"); os.makedirs(scratch, exist_ok=True)
+                try: elapsed = measure(runner, source, scratch, args.repeat)
+                except OSError as e:
+                    print(f"{workload:12} {name:26} unsupported here ({e.strerror or e})"); continue
+                finally: shutil.rmtree(scratch, ignore_errors=True)
+                row = {"workload": workload, "strategy": name, "seconds": elapsed,
+                       "mb_per_second": total / 1048576 / elapsed, "files_per_second": files / elapsed}
+                results.append(row)
+                print(f"{workload:12} {name:26} {elapsed:8.3f} s {row['mb_per_second']:9.1f} MB/s {row['files_per_second']:10.0f} files/s")
+        if args.json:
+            with open(args.json, "w") as f: json.dump({"platform": sys.platform, "results": results}, f, indent=2)
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()